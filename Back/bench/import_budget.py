@@ -0,0 +1,61 @@
+# ===============================================
+# bench/import_budget.py
+# Cold-start check: `import floorplan_final` must stay under a time budget
+# and must not pull in matplotlib or the process pool.
+#
+#   python bench/import_budget.py [--budget-ms 300] [--runs 5]
+# ===============================================
+
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BACK_DIR = Path(__file__).resolve().parent.parent
+MODULE = "floorplan_final"
+DEFAULT_BUDGET_MS = 300
+FORBIDDEN = ["matplotlib", "concurrent.futures.process"]
+
+def measure_once(module=MODULE):
+    # Fresh interpreter per run so nothing is already cached in sys.modules
+    probe = f"import sys, {module}; print(','.join(m for m in {FORBIDDEN!r} if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", probe],
+                         cwd=BACK_DIR, capture_output=True, text=True, check=True)
+    total_us = None
+    for line in out.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        parts = [p.strip() for p in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            total_us = int(parts[1])
+    leaked = [m for m in out.stdout.strip().split(",") if m]
+    return total_us / 1000.0, leaked
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time budget check for floorplan_final")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    times, leaked = [], set()
+    for _ in range(args.runs):
+        ms, extra = measure_once()
+        times.append(ms)
+        leaked.update(extra)
+    median = statistics.median(times)
+    print(f"⏱  import {MODULE}: median {median:.1f} ms over {args.runs} runs "
+          f"(min {min(times):.1f}, max {max(times):.1f}, budget {args.budget_ms:.0f} ms)")
+
+    failed = False
+    if leaked:
+        print(f"❌ eagerly imported: {', '.join(sorted(leaked))}")
+        failed = True
+    if median > args.budget_ms:
+        print(f"❌ import time over budget by {median - args.budget_ms:.1f} ms")
+        failed = True
+    if not failed:
+        print("✅ within budget")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,291 @@
+# ===============================================
+# bench/loadtest.py
+# Load test for the generate-plans flow.
+#
+# Starts a local stand-in for POST /api/v1/generate-plans (same form fields,
+# validation and 10 MB upload limit as Back/app.js) that runs floorplan_final.py
+# for every accepted request on a bounded worker pool, then replays a realistic
+# request mix at each concurrency level and reports throughput, latency
+# percentiles and per-worker CPU / peak RSS.
+#
+#   python bench/loadtest.py --concurrency 1,2,4,8 --requests 16 --workers 4
+#   python bench/loadtest.py --url http://localhost:3000/api/v1/generate-plans
+# ===============================================
+
+import argparse
+import json
+import math
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+BACK_DIR = Path(__file__).resolve().parent.parent
+GENERATOR = BACK_DIR / "floorplan_final.py"
+ENDPOINT = "/api/v1/generate-plans"
+MAX_UPLOAD = 10 * 1024 * 1024            # multer limits.fileSize
+DUNUM_M2 = 1000.0
+
+# Frontend project types (front/src/constants/upload.constants.ts) -> generator types
+PROJECT_TYPES = {"house": "HOUSE", "school": "SCHOOL", "university": "SCHOOL",
+                 "commercial": "COMPANY", "hospital": "HOSPITAL"}
+
+# (weight, projectType, area range m², budget range) — mostly houses, a long tail of big sites
+REQUEST_MIX = [
+    (0.50, "house", (200, 600), (250_000, 700_000)),
+    (0.20, "commercial", (800, 2_500), (500_000, 1_500_000)),
+    (0.15, "school", (2_000, 6_000), (800_000, 1_500_000)),
+    (0.05, "university", (6_000, 15_000), (1_000_000, 1_500_000)),
+    (0.10, "hospital", (1_500, 12_000), (1_000_000, 1_500_000)),
+]
+SHAPES = [(0.55, "rectangle"), (0.15, "square"), (0.10, "Lshape"),
+          (0.08, "irregular"), (0.07, "courtyard"), (0.05, "triangle")]
+
+# ---------- Request mix ----------
+def pick(rng, weighted):
+    r, acc = rng.random(), 0.0
+    for item in weighted:
+        acc += item[0]
+        if r <= acc:
+            return item
+    return weighted[-1]
+
+def fake_image(rng, max_bytes):
+    # Survey photos: mostly a few MB, occasionally close to the limit
+    size = int(min(max_bytes, rng.lognormvariate(14.5, 0.8)))
+    header = b"\x89PNG\r\n\x1a\n"
+    return header + rng.randbytes(max(0, size - len(header)))
+
+def make_request(rng, max_image_bytes=MAX_UPLOAD):
+    _, project_type, (a0, a1), (b0, b1) = pick(rng, REQUEST_MIX)
+    area = rng.uniform(a0, a1)
+    unit = "m2"
+    if area >= 2_000 and rng.random() < 0.4:
+        area, unit = area / DUNUM_M2, "dunum"
+    fields = {
+        "projectType": project_type,
+        "budget": str(round(rng.uniform(b0, b1), -4)),
+        "floors": str(rng.choice([1, 1, 2, 3, 4])),
+        "area": f"{area:.2f}",
+        "areaUnit": unit,
+        "landShape": pick(rng, SHAPES)[1],
+    }
+    return fields, fake_image(rng, max_image_bytes)
+
+def encode_multipart(fields, image, filename="survey.png", mimetype="image/png"):
+    boundary = f"----loadtest{random.getrandbits(64):016x}"
+    parts = []
+    for k, v in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{k}"\r\n\r\n{v}\r\n'.encode())
+    parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+                 f"Content-Type: {mimetype}\r\n\r\n".encode() + image + b"\r\n")
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+# ---------- Local stand-in ----------
+def run_generator(building_type, land_shape, area_m2, budget):
+    # One generator process per request, as server.js would spawn it; wait4 gives its own rusage
+    workdir = tempfile.mkdtemp(prefix="loadtest_")
+    env = dict(os.environ, MPLBACKEND="Agg")
+    try:
+        # stderr goes to a file, not a pipe: nobody drains a pipe while we block in wait4,
+        # so a chatty traceback could fill it and hang both processes
+        with tempfile.TemporaryFile() as err:
+            proc = subprocess.Popen([sys.executable, str(GENERATOR), building_type, land_shape, str(area_m2), str(budget)],
+                                    cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=err)
+            _, status, usage = os.wait4(proc.pid, 0)
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            err.seek(0)
+            stderr = err.read().decode(errors="replace")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return {
+        "exit_code": proc.returncode,
+        "cpu_s": usage.ru_utime + usage.ru_stime,
+        "rss_mb": usage.ru_maxrss / 1024.0,     # KiB on Linux
+        "error": stderr.strip().splitlines()[-1] if proc.returncode and stderr.strip() else None,
+    }
+
+class StandInHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if self.path != ENDPOINT:
+            return self._json(404, {"success": False, "message": "Not found"})
+        length = int(self.headers.get("Content-Length", 0))
+        raw = self.rfile.read(length)
+        msg = BytesParser(policy=HTTP).parsebytes(
+            f"Content-Type: {self.headers.get('Content-Type', '')}\r\n\r\n".encode() + raw)
+        fields, upload = {}, None
+        for part in msg.iter_parts() if msg.is_multipart() else []:
+            name = part.get_param("name", header="content-disposition")
+            if part.get_filename():
+                upload = (part.get_content_type(), part.get_payload(decode=True) or b"")
+            else:
+                fields[name] = part.get_payload(decode=True).decode()
+
+        # multer: fileFilter + limits.fileSize (its error reaches the global 500 handler)
+        if upload and upload[0] not in ("image/jpeg", "image/png", "image/jpg"):
+            return self._json(500, {"success": False, "message": "Invalid file type. Only JPEG, JPG, and PNG allowed."})
+        if upload and len(upload[1]) > MAX_UPLOAD:
+            return self._json(500, {"success": False, "message": "File too large"})
+        errors = validate_fields(fields, upload)
+        if errors:
+            return self._json(400, {"success": False, "message": "Validation failed", "errors": errors})
+
+        area = float(fields["area"]) * (DUNUM_M2 if fields["areaUnit"] == "dunum" else 1.0)
+        building_type = PROJECT_TYPES.get(fields["projectType"].lower(), "HOUSE")
+        queued = time.perf_counter()
+        with self.server.pool:
+            started = time.perf_counter()
+            result = run_generator(building_type, fields.get("landShape", "rectangle"), area, float(fields["budget"]))
+        result["queue_s"] = started - queued
+        if result["exit_code"] != 0:
+            return self._json(500, {"success": False, "message": result["error"] or "Generator failed", "worker": result})
+        self._json(200, {"success": True, "message": "Architectural plans generated successfully.", "worker": result})
+
+def validate_fields(fields, upload):
+    # Same checks as validateRequest in Back/app.js
+    errors = []
+    def number(key):
+        try:
+            return float(fields.get(key, ""))
+        except ValueError:
+            return None
+    if not fields.get("projectType"):
+        errors.append("Project type is required")
+    if not (number("budget") or 0) > 0:
+        errors.append("Valid budget is required")
+    if not (number("floors") or 0) >= 1:
+        errors.append("Valid number of floors is required")
+    if not (number("area") or 0) > 0:
+        errors.append("Valid area is required")
+    if fields.get("areaUnit") not in ("m2", "dunum"):
+        errors.append("Valid area unit is required")
+    if not upload:
+        errors.append("Image file is required")
+    return errors
+
+def start_stand_in(workers, port=0):
+    server = ThreadingHTTPServer(("127.0.0.1", port), StandInHandler)
+    server.daemon_threads = True
+    server.pool = threading.BoundedSemaphore(workers)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}{ENDPOINT}"
+
+# ---------- Load driver ----------
+def send(url, fields, image, timeout):
+    body, content_type = encode_multipart(fields, image)
+    req = urllib.request.Request(url, data=body, method="POST", headers={"Content-Type": content_type})
+    t0 = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            status, payload = resp.status, resp.read()
+    except urllib.error.HTTPError as e:
+        status, payload = e.code, e.read()
+    except OSError as e:
+        return {"status": 0, "latency_s": time.perf_counter() - t0, "error": str(e)}
+    latency = time.perf_counter() - t0
+    try:
+        data = json.loads(payload)
+    except ValueError:
+        data = {}
+    return {"status": status, "latency_s": latency, "worker": data.get("worker"), "error": data.get("message")}
+
+def percentile(values, q):
+    # Nearest-rank, good enough for a handful of samples
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[max(0, math.ceil(q / 100.0 * len(values)) - 1)]
+
+def run_level(url, concurrency, requests, rng, timeout, max_image_bytes):
+    jobs = [make_request(rng, max_image_bytes) for _ in range(requests)]
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda job: send(url, *job, timeout), jobs))
+    wall = time.perf_counter() - t0
+
+    ok = [r for r in results if r["status"] == 200]
+    latencies = [r["latency_s"] * 1000 for r in ok]
+    workers = [r["worker"] for r in results if r.get("worker")]
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "ok": len(ok),
+        "errors": len(results) - len(ok),
+        "throughput_rps": len(ok) / wall if wall > 0 else 0.0,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "worker_cpu_s": sum(w["cpu_s"] for w in workers) / len(workers) if workers else float("nan"),
+        "worker_rss_mb": max((w["rss_mb"] for w in workers), default=float("nan")),
+        "queue_p95_ms": percentile([w["queue_s"] * 1000 for w in workers if "queue_s" in w], 95),
+        "sample_errors": sorted({r["error"] for r in results if r["status"] != 200 and r.get("error")})[:3],
+    }
+
+def print_report(rows):
+    print(f"\n{'conc':>5} {'ok':>4} {'err':>4} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'cpu s':>7} {'rss MB':>7} {'queue p95':>10}")
+    print("-" * 78)
+    for r in rows:
+        print(f"{r['concurrency']:>5} {r['ok']:>4} {r['errors']:>4} {r['throughput_rps']:>7.2f} "
+              f"{r['p50_ms']:>8.0f} {r['p95_ms']:>8.0f} {r['p99_ms']:>8.0f} "
+              f"{r['worker_cpu_s']:>7.2f} {r['worker_rss_mb']:>7.1f} {r['queue_p95_ms']:>10.0f}")
+        for e in r["sample_errors"]:
+            print(f"      ⚠️  {e}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test for /api/v1/generate-plans")
+    parser.add_argument("--concurrency", default="1,2,4,8", help="comma-separated levels to sweep")
+    parser.add_argument("--requests", type=int, default=16, help="requests per level")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="stand-in generator pool size")
+    parser.add_argument("--url", help="hit a running server instead of the local stand-in")
+    parser.add_argument("--max-image-mb", type=float, default=10.0)
+    parser.add_argument("--timeout", type=float, default=600.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if not url:
+        server, url = start_stand_in(args.workers)
+        print(f"🧪 Stand-in listening at {url} with {args.workers} generator workers")
+
+    rng = random.Random(args.seed)
+    rows = []
+    try:
+        for level in (int(c) for c in args.concurrency.split(",")):
+            print(f"▶️  concurrency {level}: {args.requests} requests ...", flush=True)
+            rows.append(run_level(url, level, args.requests, rng, args.timeout, int(args.max_image_mb * 1024 * 1024)))
+    finally:
+        if server:
+            server.shutdown()
+
+    print_report(rows)
+    if args.json:
+        Path(args.json).write_text(json.dumps(rows, indent=2))
+
+if __name__ == "__main__":
+    main()
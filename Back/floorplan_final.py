@@ -5,13 +5,17 @@
 # ===============================================
 
 from pathlib import Path
-import os
+import os, sys, json
 import random, math
-from dataclasses import dataclass
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
+from dataclasses import dataclass, field
+from contextlib import contextmanager
+import numpy as np
+# matplotlib is imported inside the drawing functions: it is most of the import
+# time and geometry-only callers (catalogue, plan store, workers) never need it.
+# The same goes for the opt-in campus process pool (concurrent.futures).
 from shapely.geometry import Polygon, Point, LineString, MultiLineString, box
-from shapely.affinity import scale
+from shapely.affinity import scale, affine_transform
+from shapely import wkt
 from shapely.ops import unary_union
 
 # ---- Building Types ----
@@ -70,6 +74,25 @@ ROOM_SIZE_LIMITS = {
     "Bathroom": (4, 8), "Parking": (12, 40)
 }
 
+# ---- Room type registry ----
+# Every zone resolves its base room type ("Block A Patient Ward 2" -> "Patient Room")
+# to a small integer id once, so door rules can be compiled to bitmasks instead of
+# re-scanning strings. The registry is seeded with every known type below.
+ROOM_TYPES = []
+ROOM_TYPE_IDS = {}
+
+def room_label(name: str) -> str:
+    head, _, tail = name.rpartition(" ")
+    return head if head and tail.isdigit() else name
+
+def room_type_id(name: str) -> int:
+    rtype = base_type(room_label(name))
+    tid = ROOM_TYPE_IDS.get(rtype)
+    if tid is None:
+        tid = ROOM_TYPE_IDS[rtype] = len(ROOM_TYPES)
+        ROOM_TYPES.append(rtype)
+    return tid
+
 # ---- Data model ----
 @dataclass
 class Zone:
@@ -78,6 +101,15 @@ class Zone:
     weight: float
     poly: Polygon = None
     area: float = 0.0
+    type_id: int = field(default=-1, init=False, repr=False)
+
+    def __post_init__(self):
+        self.type_id = room_type_id(self.name)
+
+    def __setstate__(self, state):
+        # Zones laid out in worker processes carry ids from another registry
+        self.__dict__.update(state)
+        self.type_id = room_type_id(self.name)
 
 # ---- Configs ----
 BUILDING_CONFIGS = {
@@ -88,7 +120,7 @@ BUILDING_CONFIGS = {
         "private_base": {"Utility":0.12, "Study":0.14, "Bath":0.16, "Bedroom":0.58},
         "requires_parking": True
     },
-    "HOSPITAL": {"requires_parking": True},
+    "HOSPITAL": {"requires_parking": True, "campus_block_area": 2000},
     "COMPANY": {
         "band_weights": {"low": [0.22,0.46,0.12,0.20], "medium": [0.24,0.44,0.12,0.20], "high": [0.26,0.42,0.12,0.20]},
         "public_rooms": {"Lobby":0.30, "Meeting Room":0.30, "Conference":0.40},
@@ -101,7 +133,8 @@ BUILDING_CONFIGS = {
         "public_rooms": {"Admin Office":0.25, "Library":0.35, "Cafeteria":0.40},
         "service_rooms": {"Science Lab":0.30, "Computer Lab":0.20, "Arts Room":0.20},
         "private_base": {"Storage":0.30, "Bathroom":0.40, "Gym":0.30},
-        "requires_parking": True
+        "requires_parking": True,
+        "campus_block_area": 2000
     }
 }
 
@@ -158,11 +191,10 @@ def draw_window_on_segment(ax, seg: LineString, size=1.4, lw=5, z=35):
     ax.plot([x0,x1],[y0,y1], color="white", lw=lw, solid_capstyle='butt', zorder=z)
     ax.plot([x0,x1],[y0,y1], color="black", lw=1.2, zorder=z+1)
 
-def draw_door_between(ax, a: Polygon, b: Polygon, gap=0.9, z=40):
-    seg = longest_shared_segment(a,b)
-    if not seg:
-        return
-    (mx,my),(dx,dy),(nx,ny) = segment_mid_normal(seg, outward_from=a)
+def draw_door_on_segment(ax, seg: LineString, gap=0.9, z=40):
+    (x1,y1),(x2,y2) = list(seg.coords)[:2]
+    mx,my = (x1+x2)/2, (y1+y2)/2
+    dx,dy = x2-x1, y2-y1
     L = math.hypot(dx,dy) or 1.0
     ux,uy = dx/L, dy/L
     gap = min(gap, seg.length*0.6)
@@ -172,14 +204,19 @@ def draw_door_between(ax, a: Polygon, b: Polygon, gap=0.9, z=40):
     ax.plot([x0,x1],[y0,y1], color="black", lw=1.2, zorder=z+1)
     r = 0.45
     angle = math.degrees(math.atan2(uy,ux))
+    import matplotlib.patches as patches
     arc = patches.Arc((x0,y0), 2*r, 2*r, angle=angle, theta1=0, theta2=90, lw=1.2, zorder=z+1)
     ax.add_patch(arc)
 
-def place_driveway(land: Polygon, build: Polygon, entry: Polygon, cars=2):
-    seg = longest_shared_segment(entry, build)
-    if not seg:
-        return None
-    (mx,my),(dx,dy),(nx,ny) = segment_mid_normal(seg, outward_from=build)
+def place_driveway(land: Polygon, build: Polygon, entry: Polygon, cars=2, facade=None, clearance=None):
+    if facade:
+        seg = facade.line
+        (mx,my),(dx,dy),(nx,ny) = facade.midpoint, facade.direction, facade.normal
+    else:
+        seg = longest_shared_segment(entry, build)
+        if not seg:
+            return None
+        (mx,my),(dx,dy),(nx,ny) = segment_mid_normal(seg, outward_from=build)
     car_w, car_d = 2.5, 5.0
     width = max(car_w*cars + 0.6*(cars-1), 4.8)
     depth = 3.2 if cars==1 else 5.0
@@ -194,7 +231,7 @@ def place_driveway(land: Polygon, build: Polygon, entry: Polygon, cars=2):
         (cx1+nx*(depth+offset), cy1+ny*(depth+offset)),
         (cx0+nx*(depth+offset), cy0+ny*(depth+offset))
     ])
-    park = p.intersection(land).difference(build.buffer(0.05))
+    park = p.intersection(land).difference(clearance if clearance is not None else build.buffer(0.05))
     if park.is_empty:
         return None
     if park.geom_type == "MultiPolygon":
@@ -292,6 +329,145 @@ def split_by_area(poly: Polygon, target_areas):
     ratios = [a/total for a in target_areas]
     return split_v(poly, ratios)
 
+def split_campus(poly: Polygon, max_area: float, corridor_w=2.4, min_area=40.0):
+    # Halve along the longer side until every block fits max_area and is convex (a block
+    # wrapped around a courtyard or an L corner would push its wings into the notch);
+    # each cut leaves a corridor strip
+    if poly.area <= max_area and (poly.area >= 0.9*poly.convex_hull.area or poly.area < 4*min_area):
+        return [poly], []
+    minx, miny, maxx, maxy = poly.bounds
+    if maxx - minx >= maxy - miny:
+        mid = (minx + maxx) / 2
+        strip = box(mid - corridor_w/2, miny, mid + corridor_w/2, maxy)
+        halves = [box(minx, miny, mid - corridor_w/2, maxy), box(mid + corridor_w/2, miny, maxx, maxy)]
+    else:
+        mid = (miny + maxy) / 2
+        strip = box(minx, mid - corridor_w/2, maxx, mid + corridor_w/2)
+        halves = [box(minx, miny, maxx, mid - corridor_w/2), box(minx, mid + corridor_w/2, maxx, maxy)]
+    blocks, corridors = [], [strip.intersection(poly)]
+    for h in halves:
+        # Drop legs narrower than a corridor that a cut leaves along the edge of a hole
+        part = poly.intersection(h).buffer(-corridor_w/2, join_style=2).buffer(corridor_w/2, join_style=2).intersection(h)
+        for g in getattr(part, "geoms", [part]):
+            if g.geom_type == "Polygon" and g.area >= min_area:
+                sub_blocks, sub_corridors = split_campus(g, max_area, corridor_w, min_area)
+                blocks += sub_blocks
+                corridors += sub_corridors
+    return blocks, corridors
+
+def block_name(i: int) -> str:
+    # Spreadsheet-style: 0 -> A, 25 -> Z, 26 -> AA, ...
+    name = ""
+    i += 1
+    while i > 0:
+        i, r = divmod(i - 1, 26)
+        name = chr(ord("A") + r) + name
+    return name
+
+# ---------- Exterior edges ----------
+@dataclass
+class FacadeSegment:
+    zone: int          # index into the zones the index was built from
+    start: tuple
+    end: tuple
+    length: float
+    normal: tuple      # outward unit normal
+    bearing: float     # compass bearing of the normal, 0 = +y, clockwise
+    courtyard: bool = False   # on a hole of the footprint rather than its exterior
+
+    @property
+    def line(self):
+        return LineString([self.start, self.end])
+
+    @property
+    def midpoint(self):
+        return ((self.start[0]+self.end[0])/2, (self.start[1]+self.end[1])/2)
+
+    @property
+    def direction(self):
+        return (self.end[0]-self.start[0], self.end[1]-self.start[1])
+
+    @property
+    def facing(self):
+        return "NESW"[int(((self.bearing + 45) % 360) // 90)]
+
+class ExteriorEdgeIndex:
+    # Footprint boundary split into per-zone facade pieces, built once with plain
+    # segment arithmetic; windows, driveway and facade checks are then lookups.
+    def __init__(self, build, zones, tol=1e-6):
+        self.build = build
+        self.zones = zones
+        self.edges = []
+        for part in getattr(build, "geoms", [build]):
+            for ring, hole in [(part.exterior, False)] + [(r, True) for r in part.interiors]:
+                # Outward = away from the building: right of a CCW shell, left of a CCW hole
+                right = ring.is_ccw != hole
+                pts = list(ring.coords)
+                for (x0,y0),(x1,y1) in zip(pts[:-1], pts[1:]):
+                    L = math.hypot(x1-x0, y1-y0)
+                    if L <= tol:
+                        continue
+                    ux,uy = (x1-x0)/L, (y1-y0)/L
+                    nx,ny = (uy,-ux) if right else (-uy,ux)
+                    self.edges.append((x0, y0, ux, uy, L, nx, ny, hole,
+                                       (min(x0,x1)-tol, min(y0,y1)-tol, max(x0,x1)+tol, max(y0,y1)+tol)))
+
+        self.by_zone = {}
+        for i, z in enumerate(zones):
+            if not z.poly or z.poly.is_empty:
+                continue
+            spans = {}
+            for g in getattr(z.poly, "geoms", [z.poly]):
+                ring = list(g.exterior.coords)
+                for a, b in zip(ring[:-1], ring[1:]):
+                    for e, span in self._overlaps(a, b, tol):
+                        spans.setdefault(e, []).append(span)
+            facades = []
+            for e, intervals in spans.items():
+                for lo, hi in self._merge(intervals, tol):
+                    facades.append(self._facade(i, e, lo, hi))
+            facades.sort(key=lambda f: f.length, reverse=True)
+            self.by_zone[i] = facades
+        self._clearance = None
+
+    def _overlaps(self, a, b, tol):
+        (ax,ay),(bx,by) = a, b
+        for e, (x0, y0, ux, uy, L, _, _, _, (minx, miny, maxx, maxy)) in enumerate(self.edges):
+            if max(ax,bx) < minx or min(ax,bx) > maxx or max(ay,by) < miny or min(ay,by) > maxy:
+                continue
+            # Both ends on the edge's line -> the zone edge runs along the facade
+            if abs((ax-x0)*uy - (ay-y0)*ux) > tol or abs((bx-x0)*uy - (by-y0)*ux) > tol:
+                continue
+            ta, tb = (ax-x0)*ux + (ay-y0)*uy, (bx-x0)*ux + (by-y0)*uy
+            lo, hi = max(0.0, min(ta,tb)), min(L, max(ta,tb))
+            if hi - lo > tol:
+                yield e, (lo, hi)
+
+    @staticmethod
+    def _merge(intervals, tol):
+        merged = []
+        for lo, hi in sorted(intervals):
+            if merged and lo <= merged[-1][1] + tol:
+                merged[-1][1] = max(merged[-1][1], hi)
+            else:
+                merged.append([lo, hi])
+        return merged
+
+    def _facade(self, zone, e, lo, hi):
+        x0, y0, ux, uy, _, nx, ny, hole, _ = self.edges[e]
+        return FacadeSegment(zone, (x0+ux*lo, y0+uy*lo), (x0+ux*hi, y0+uy*hi), hi-lo,
+                             (nx,ny), math.degrees(math.atan2(nx, ny)) % 360, hole)
+
+    def for_zone(self, zone, courtyard=True):
+        # Facade pieces of one zone, longest first
+        facades = self.by_zone.get(zone, [])
+        return facades if courtyard else [f for f in facades if not f.courtyard]
+
+    def clearance(self):
+        if self._clearance is None:
+            self._clearance = self.build.buffer(0.05)
+        return self._clearance
+
 # ---------- Areas ----------
 def calculate_room_areas(zones):
     for zone in zones:
@@ -303,12 +479,17 @@ def sort_zones_by_x(zones):
 
 # ---------- Engine ----------
 class MultiBuildingEngine:
-    def __init__(self, building_type="HOUSE", land_shape="rectangle", W=24, H=14, budget=400_000, seed=None):
+    def __init__(self, building_type="HOUSE", land_shape="rectangle", W=24, H=14, budget=400_000, seed=None, workers=None):
         random.seed(seed)
         self.building_type = building_type
         self.building_config = BUILDING_CONFIGS[building_type]
         self.building_info = BUILDING_TYPES[building_type]
         self.land = make_land(land_shape, W, H)
+        self.land_shape = land_shape
+        self.budget = budget
+        self.seed = seed
+        self.workers = workers
+        self.edges = None   # ExteriorEdgeIndex of the last layout, reused by the renderer
         self.tier = classify_budget(budget)
         self.total_building_area = 0.0
 
@@ -341,7 +522,11 @@ class MultiBuildingEngine:
             counts["Bath"] = 2  # ensure at least 2 in houses
         return counts
 
-    def _group_rooms(self, base_name, per_room_type, total_count, per_group):
+    def _group_rooms(self, base_name, per_room_type, total_count, per_group, n_groups=None):
+        if n_groups:
+            # Fixed number of groups whose sizes differ by at most one room
+            q, r = divmod(total_count, n_groups)
+            return [(f"{base_name} {i+1}", per_room_type, q + (i < r)) for i in range(n_groups)]
         groups = []
         n = max(1, per_group)
         idx, remaining = 1, total_count
@@ -377,6 +562,167 @@ class MultiBuildingEngine:
         build = self.footprint()
         bt = self.building_type
 
+        block_area = self.building_config.get("campus_block_area")
+        if block_area and self.total_building_area > 2*block_area:
+            zones, corridors = self._campus_zones(build, block_area, bedrooms, baths, with_study)
+        else:
+            zones, corridors = self._zones(build, bedrooms, baths, with_study)
+
+        # Areas
+        calculate_room_areas(zones)
+
+        self.edges = ExteriorEdgeIndex(build, zones)
+        return build, zones, corridors, self._parking(build, zones)
+
+    def warm_start(self, entry):
+        # Refit a catalogue layout to this plot: map its footprint box onto ours and clip
+        build = self.footprint()
+        sx0, sy0, sx1, sy1 = entry["build"].bounds
+        bx0, by0, bx1, by1 = build.bounds
+        xf = (bx1-bx0) / max(1e-6, sx1-sx0)
+        yf = (by1-by0) / max(1e-6, sy1-sy0)
+        fit = lambda g: affine_transform(g, [xf, 0, 0, yf, bx0 - sx0*xf, by0 - sy0*yf]).intersection(build)
+
+        zones = []
+        for name, kind, weight, poly in entry["zones"]:
+            poly = fit(poly)
+            if not poly.is_empty and poly.area > 1e-6:
+                zones.append(Zone(name, kind, weight, poly))
+        corridors = [c for c in (fit(c) for c in entry["corridors"]) if not c.is_empty]
+        calculate_room_areas(zones)
+        self.edges = ExteriorEdgeIndex(build, zones)
+        return build, zones, corridors, self._parking(build, zones)
+
+    def _parking(self, build, zones):
+        bt = self.building_type
+        parking = None
+        if bt == "HOUSE":
+            entry = next((i for i, z in enumerate(zones) if z.name=="Entry"), None)
+        elif bt == "HOSPITAL":
+            entry = next((i for i, z in enumerate(zones) if "Reception" in z.name), None)
+        else:
+            entry = next((i for i, z in enumerate(zones) if z.kind=="public"), None)
+        if BUILDING_CONFIGS[bt].get("requires_parking", True) and entry is not None:
+            cars = 3 if bt in ["HOSPITAL","SCHOOL"] else 2
+            facades = self.edges.for_zone(entry)
+            if facades and facades[0].length >= 0.1:
+                parking = place_driveway(self.land, build, zones[entry].poly, cars=cars,
+                                         facade=facades[0], clearance=self.edges.clearance())
+        return parking
+
+    def _campus_zones(self, build, block_area, bedrooms=3, baths=2, with_study=True):
+        blocks, strips = split_campus(build, block_area)
+        # Front-most block keeps the public program; the others become wings
+        cx = build.centroid.x
+        blocks.sort(key=lambda b: (round(b.centroid.y, 1), abs(b.centroid.x - cx)))
+        base_seed = self.seed if self.seed is not None else random.randint(1, 99999)
+        jobs = []
+        for i, block in enumerate(blocks):
+            role = "main" if i == 0 else f"Block {block_name(i - 1)}"
+            jobs.append((self.building_type, self.budget, base_seed + i, block, role, (bedrooms, baths, with_study)))
+
+        # Blocks are independent; a pool only pays off for very large sites, so it is opt-in
+        workers = min(self.workers or 1, len(jobs))
+        if workers > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_campus_block_job, jobs))
+        else:
+            results = [_campus_block_job(job) for job in jobs]
+
+        zones, corridors = [], []
+        for block_zones, block_corridors in results:
+            zones += self._absorb_slivers(block_zones)
+            corridors += block_corridors
+        # The strips between blocks are walkable corridors, so they are drawn and get doors
+        # (a strip crossing a courtyard comes out in pieces; each is its own corridor)
+        pieces = [g for s in strips for g in getattr(s, "geoms", [s]) if g.geom_type == "Polygon" and not g.is_empty]
+        zones += [Zone(f"Corridor {k+1}", "circulation", 0.0, g) for k, g in enumerate(pieces)]
+        return zones, corridors
+
+    def _absorb_slivers(self, zones, min_area=6.0, min_width=1.5):
+        # Odd block outlines can still leave a room too small or too narrow to use; fold it
+        # into the room it shares most wall with (or drop it) rather than print it
+        def narrow(poly):
+            ring = poly.minimum_rotated_rectangle.exterior.coords
+            return min(math.dist(ring[0], ring[1]), math.dist(ring[1], ring[2])) < min_width
+        adjacency = zone_adjacency(zones, min_len=0.05)
+        slivers = {i for i, z in enumerate(zones) if z.poly.area < min_area or narrow(z.poly)}
+        for i in sorted(slivers, key=lambda i: zones[i].poly.area):
+            best = max((n for n in adjacency[i] if n[1] not in slivers and zones[n[1]].kind != "circulation"),
+                       key=lambda n: n[0], default=None)
+            if best:
+                host = zones[best[1]]
+                host.poly = unary_union([host.poly, zones[i].poly]).buffer(0)
+        return [z for i, z in enumerate(zones) if i not in slivers]
+
+    def _wing_zones(self, build, block):
+        bt = self.building_type
+        # Rooms run along the long side, so lay out on a wide block; mirroring over x=y is
+        # exact, which keeps the walls shared with the campus corridors
+        minx, miny, maxx, maxy = build.bounds
+        turned = (maxy - miny) > (maxx - minx)
+        mirror = lambda g: affine_transform(g, [0, 1, 1, 0, 0, 0])
+        if turned:
+            build = mirror(build)
+        minx, miny, maxx, maxy = build.bounds
+        area = build.area
+
+        extras = [(f"{block} Bathroom {i+1}","Bathroom",1) for i in range(max(1, int(area/1500)))]
+        if bt == "HOSPITAL":
+            unit, group_name, per_group = "Patient Room", "Patient Ward", 6
+            extras = [(f"{block} Nurses Station","Nurses Station",1)] + extras
+        else:
+            unit, group_name, per_group = "Classroom", "Classroom Wing", 4
+            extras += [(f"{block} Storage","Storage",1)]
+        extra_targets = [scaled_room_area(t, area, self.tier) for _,t,_ in extras]
+
+        # Service rooms get their own full-depth strip at the end of the wing, so they
+        # are never squeezed into slivers between wards
+        # Depth from the real area, so a block that does not fill its box still gets room
+        width, depth = maxx - minx, area / max(1e-6, maxx - minx)
+        strip_w = min(width/3, max(3.0, sum(extra_targets)/depth))
+        service, rest = split_v(build, [strip_w, width - strip_w])
+        stack = split_h if depth >= strip_w else split_v
+        z_s = [Zone(n,"service",w,p) for (n,_,_),w,p in zip(extras,extra_targets,stack(service, extra_targets))]
+
+        # Two rows of wards on either side of a walkable corridor that runs into the campus
+        # ones; a block too shallow for that gets one row spanning its depth
+        height, hall_w = maxy - miny, 2.4
+        if height >= 2*4.0 + hall_w:
+            row_a, hall, row_b = split_h(rest, [(height - hall_w)/2, hall_w, (height - hall_w)/2])
+            rows = [row_a, row_b]
+        else:
+            rows, hall = [rest], None
+        lo, hi = ROOM_SIZE_LIMITS[unit]
+        unit_area = (lo + hi) / 2 * (1.0 + min(0.35, (area/1200.0)*0.1))
+        n_units = max(per_group, int(sum(r.area for r in rows)*0.9 / unit_area))
+        # Equal groups, the same number per row: a leftover one-room group would be
+        # stretched along the whole row into a long thin ward
+        n_groups = math.ceil(n_units / per_group)
+        n_groups += n_groups % len(rows)
+        groups = self._group_rooms(f"{block} {group_name}", unit, n_units, per_group, n_groups)
+        per_row = len(groups) // len(rows)
+
+        zones = []
+        for k, row in enumerate(rows):
+            items = groups[k*per_row:(k+1)*per_row]
+            targets = [m*scaled_room_area(t, area, self.tier) for _,t,m in items]
+            row_zones = [Zone(n,"private",w,p) for (n,_,_),w,p in zip(items,targets,split_by_area(row, targets))]
+            zones += self._merge_small(row_zones, 22.0)
+        zones += z_s
+        if hall is not None:
+            zones.append(Zone(f"{block} Corridor", "circulation", 0.0, hall))
+
+        if turned:
+            for z in zones:
+                z.poly = mirror(z.poly)
+        return zones, []
+
+    def _zones(self, build, bedrooms=3, baths=2, with_study=True):
+        bt = self.building_type
+        area = build.area
+
         if bt == "HOSPITAL":
             tier = self.tier
             band_front = {"low":0.28, "medium":0.30, "high":0.32}[tier]
@@ -392,14 +738,14 @@ class MultiBuildingEngine:
                         corridors.append(virt)
 
             pub_labels = ["Reception","Waiting","Consultation","Admin"]
-            targets = [scaled_room_area(n, self.total_building_area, self.tier) for n in pub_labels]
+            targets = [scaled_room_area(n, area, self.tier) for n in pub_labels]
             z_front = [Zone(n,"public",t,p) for n,t,p in zip(pub_labels,targets,split_by_area(front, targets))]
 
-            counts = self._smart_counts(self.total_building_area)
+            counts = self._smart_counts(area)
             wards = self._group_rooms("Patient Ward", "Patient Room", counts["Patient Room"], per_group=6)
             icus  = self._group_rooms("ICU Unit", "ICU", counts["ICU"], per_group=3)
             core_items = wards + icus + [("Nurses Station","Nurses Station",1)]
-            core_targets = [m*scaled_room_area(t, self.total_building_area, self.tier) for _,t,m in core_items]
+            core_targets = [m*scaled_room_area(t, area, self.tier) for _,t,m in core_items]
             core_names = [nm for nm,_,_ in core_items]
             z_core = [Zone(n,"private",w,p) for n,w,p in zip(core_names,core_targets,split_by_area(core, core_targets))]
             z_core = self._merge_small(z_core, 24.0)
@@ -410,7 +756,7 @@ class MultiBuildingEngine:
             # bathrooms for hospital (keep visible; they won't be merged)
             for i in range(counts["Bathroom"]):
                 rears.append((f"Bathroom {i+1}","Bathroom",1))
-            rear_targets = [m*scaled_room_area(t, self.total_building_area, self.tier) for _,t,m in rears]
+            rear_targets = [m*scaled_room_area(t, area, self.tier) for _,t,m in rears]
             rear_names = [nm for nm,_,_ in rears]
             z_rear = [Zone(n,"service",w,p) for n,w,p in zip(rear_names,rear_targets,split_by_area(rear, rear_targets))]
             # let small labs merge but keep bathrooms by rule above
@@ -440,14 +786,14 @@ class MultiBuildingEngine:
                     corridors.append(virt)
 
             pub_labels = list(self.building_config["public_rooms"].keys())
-            pub_targets = [scaled_room_area(n, self.total_building_area, self.tier) for n in pub_labels]
+            pub_targets = [scaled_room_area(n, area, self.tier) for n in pub_labels]
             z_public = [Zone(n,"public",w,p) for n,w,p in zip(pub_labels,pub_targets,split_by_area(public, pub_targets))]
 
             serv_labels = list(self.building_config["service_rooms"].keys())
-            serv_targets = [scaled_room_area(n, self.total_building_area, self.tier) for n in serv_labels]
+            serv_targets = [scaled_room_area(n, area, self.tier) for n in serv_labels]
             z_service = [Zone(n,"service",w,p) for n,w,p in zip(serv_labels,serv_targets,split_by_area(service, serv_targets))]
 
-            counts = self._smart_counts(self.total_building_area)
+            counts = self._smart_counts(area)
             priv_items = []
             if bt == "HOUSE":
                 priv_items.append(("Utility","Utility",1))
@@ -471,7 +817,7 @@ class MultiBuildingEngine:
                 priv_items += [(f"Storage {i+1}","Storage",1) for i in range(counts["Storage"])]
                 priv_items += [("Gym","Gym",1)]
 
-            priv_targets = [m*scaled_room_area(t, self.total_building_area, self.tier) for _,t,m in priv_items]
+            priv_targets = [m*scaled_room_area(t, area, self.tier) for _,t,m in priv_items]
             priv_names = [nm for nm,_,_ in priv_items]
             z_private = [Zone(n,"private",w,p) for n,w,p in zip(priv_names,priv_targets,split_by_area(private, priv_targets))]
             z_private = self._merge_small(z_private, 20.0)
@@ -502,22 +848,15 @@ class MultiBuildingEngine:
                 if best is not z_central:
                     z_central.poly, best.poly = best.poly, z_central.poly
 
-        # Areas
-        calculate_room_areas(zones)
-
-        # Parking
-        parking = None
-        if bt == "HOUSE":
-            entry_poly = next((z.poly for z in zones if z.name=="Entry"), None)
-        elif bt == "HOSPITAL":
-            entry_poly = next((z.poly for z in zones if "Reception" in z.name), None)
-        else:
-            entry_poly = next((z.poly for z in zones if z.kind=="public"), None)
-        if BUILDING_CONFIGS[bt].get("requires_parking", True) and entry_poly:
-            cars = 3 if bt in ["HOSPITAL","SCHOOL"] else 2
-            parking = place_driveway(self.land, build, entry_poly, cars=cars)
+        return zones, corridors
 
-        return build, zones, corridors, parking
+def _campus_block_job(job):
+    # Module-level so campus blocks can be laid out in worker processes
+    building_type, budget, seed, block, role, (bedrooms, baths, with_study) = job
+    eng = MultiBuildingEngine(building_type, budget=budget, seed=seed, workers=1)
+    if role == "main":
+        return eng._zones(block, bedrooms, baths, with_study)
+    return eng._wing_zones(block, role)
 
 # ---------- Smart Doors ----------
 DOOR_POLICY = {
@@ -567,7 +906,8 @@ def base_type(name: str) -> str:
         "Bedroom","Bathroom","Bath","Storage","Server Room","Print Room","Manager Office",
         "Open Office","Meeting Room","Conference","Lobby","Reception","Waiting","Consultation",
         "Pharmacy","Lab","Radiology","Nurses Station","Library","Admin Office","Gym","Cafeteria",
-        "Arts Room","Study","Kitchen","Dining","Entry","Living","Utility","Science Lab","Classroom"
+        "Arts Room","Study","Kitchen","Dining","Entry","Living","Utility","Science Lab","Classroom",
+        "Corridor"
     ]
     for t in tokens:
         if t in name:
@@ -591,10 +931,69 @@ def max_doors_for(zone_name: str, building_type: str) -> int:
         return 2
     return 1
 
+# ---------- Compiled door policy ----------
+@dataclass
+class CompiledDoorPolicy:
+    targets: list          # type_id -> bitmask of type_ids a door may lead to
+    max_doors: list        # type_id -> door budget
+    to_corridor: list      # type_id -> policy asks for a corridor door
+
+    def allows(self, a: int, b: int) -> bool:
+        return bool(self.targets[a] >> b & 1)
+
+# Seed with every room type the generator knows so policies compile once per building
+# type; only a genuinely new room type grows the registry and triggers a recompile.
+for _name in list(ROOM_SIZE_LIMITS) + list(COL) + ["Corridor"] + [n for p in DOOR_POLICY.values() for k, v in p.items() for n in [k] + v]:
+    room_type_id(_name)
+
+_COMPILED_POLICIES = {}
+
+def compile_door_policy(building_type: str) -> CompiledDoorPolicy:
+    cached = _COMPILED_POLICIES.get(building_type)
+    if cached and len(cached.targets) == len(ROOM_TYPES):
+        return cached
+    policy = DOOR_POLICY.get(building_type, {})
+    targets, max_doors, to_corridor = [], [], []
+    for rtype in ROOM_TYPES:
+        wanted = policy.get(rtype, [])
+        mask = 0
+        for tid, other in enumerate(ROOM_TYPES):
+            if any(is_target_match(t, other) for t in wanted):
+                mask |= 1 << tid
+        targets.append(mask)
+        max_doors.append(max_doors_for(rtype, building_type))
+        to_corridor.append("Corridor" in wanted)
+    compiled = _COMPILED_POLICIES[building_type] = CompiledDoorPolicy(targets, max_doors, to_corridor)
+    return compiled
+
+# Shared walls longer than min_len: zone index -> [(length, other index, segment)]
+def zone_adjacency(zones, min_len=0.7, eps=1e-6):
+    adj = {i: [] for i in range(len(zones))}
+    boxes = sorted(((z.poly.bounds, i) for i, z in enumerate(zones) if z.poly and not z.poly.is_empty),
+                   key=lambda b: b[0][0])
+    # Sweep along x so only zones whose bounding boxes touch are compared
+    for k, ((minx, miny, maxx, maxy), i) in enumerate(boxes):
+        for (ominx, ominy, omaxx, omaxy), j in boxes[k+1:]:
+            if ominx > maxx + eps:
+                break
+            if ominy > maxy + eps or omaxy < miny - eps:
+                continue
+            # Each side keeps its own boundary orientation (door swing follows it)
+            for a, b in ((i, j), (j, i)):
+                seg = longest_shared_segment(zones[a].poly, zones[b].poly)
+                if seg and seg.length > min_len:
+                    adj[a].append((seg.length, b, seg))
+    return adj
+
 # ---------- Rendering ----------
 def enhanced_render(engine: MultiBuildingEngine, zones, build, corridors, parking, title=""):
+    import matplotlib.pyplot as plt
+    import matplotlib.patches as patches
+
     minx,miny,maxx,maxy = engine.land.bounds
-    fig, ax = plt.subplots(figsize=((maxx-minx)/2.1, (maxy-miny)/2.1))
+    # ~2.1 m per inch, but keep campus-sized sites within a printable sheet
+    m_per_in = max(2.1, max(maxx-minx, maxy-miny)/30)
+    fig, ax = plt.subplots(figsize=((maxx-minx)/m_per_in, (maxy-miny)/m_per_in))
     ax.set_xlim(minx-2, maxx+2); ax.set_ylim(miny-2, maxy+2); ax.axis("off")
 
     # Land
@@ -656,7 +1055,7 @@ def enhanced_render(engine: MultiBuildingEngine, zones, build, corridors, parkin
     draw_measurements(ax, build, engine.land)
 
     # Summary
-    total_room_area = sum(z.area for z in zones if z.poly and not z.poly.is_empty)
+    total_room_area = sum(z.area for z in zones if z.poly and not z.poly.is_empty and z.kind != "circulation")
     efficiency = (total_room_area / engine.total_building_area) * 100 if engine.total_building_area > 0 else 0
     summary_text = (f"{engine.building_info['name']}\n"
                     f"Building Area: {engine.total_building_area:.1f}m²\n"
@@ -667,63 +1066,51 @@ def enhanced_render(engine: MultiBuildingEngine, zones, build, corridors, parkin
 
     # Smart doors
     bt = engine.building_type
-    policy = DOOR_POLICY.get(bt, {})
+    policy = compile_door_policy(bt)
+    adjacency = zone_adjacency(zones)
 
-    def allowed_targets_for(name: str):
-        b = base_type(name)
-        return policy.get(b, policy.get(name, []))
-
-    for z in zones:
-        max_allowed = max_doors_for(z.name, bt)
-        targets = allowed_targets_for(z.name)
+    for i, z in enumerate(zones):
+        if z.kind == "circulation":
+            continue
+        max_allowed = policy.max_doors[z.type_id]
         doors_drawn = 0
+        neighbours = sorted(adjacency[i], key=lambda x: (-x[0], x[1]))
+
+        # A room on a campus corridor always opens onto it
+        hall = next(((L, seg) for L, j, seg in neighbours if zones[j].kind == "circulation"), None)
+        if hall and hall[0] > 0.7:
+            draw_door_on_segment(ax, hall[1])
+            doors_drawn += 1
+            if doors_drawn >= max_allowed:
+                continue
 
         # Prefer virtual corridor if adjacency exists
-        if corridors:
-            best_seg = None; best_corr = None
+        if corridors and policy.to_corridor[z.type_id]:
+            best_seg = None
             for c in corridors:
                 seg = longest_shared_segment(z.poly, c)
                 if seg and seg.length > 0.7:
                     if not best_seg or seg.length > best_seg.length:
-                        best_seg, best_corr = seg, c
-            if best_corr and "Corridor" in targets:
-                draw_door_between(ax, z.poly, best_corr)
+                        best_seg = seg
+            if best_seg:
+                draw_door_on_segment(ax, best_seg)
                 doors_drawn += 1
                 if doors_drawn >= max_allowed:
                     continue
 
         # Door to allowed neighbors by longest shared edge
-        candidates = []
-        for w in zones:
-            if w is z or w.poly.is_empty:
-                continue
-            if any(is_target_match(t, w.name) for t in targets):
-                seg = longest_shared_segment(z.poly, w.poly)
-                if seg and seg.length > 0.7:
-                    candidates.append((seg.length, w))
-        candidates.sort(reverse=True, key=lambda x: x[0])
-        used_ids = set()
-        for _, w in candidates:
+        for _, j, seg in neighbours:
             if doors_drawn >= max_allowed:
                 break
-            if id(w) in used_ids:
-                continue
-            draw_door_between(ax, z.poly, w.poly)
-            used_ids.add(id(w))
-            doors_drawn += 1
+            if policy.allows(z.type_id, zones[j].type_id):
+                draw_door_on_segment(ax, seg)
+                doors_drawn += 1
 
         # Fallback neighbor of different kind
         if doors_drawn == 0:
-            best_neighbor = None; best_seg = None
-            for w in zones:
-                if w is z or w.kind == z.kind:
-                    continue
-                seg = longest_shared_segment(z.poly, w.poly)
-                if seg and seg.length > 0.9:
-                    if not best_seg or seg.length > best_seg.length:
-                        best_seg, best_neighbor = seg, w
-            if best_neighbor:
-                draw_door_between(ax, z.poly, best_neighbor.poly)
+            best = next(((L, seg) for L, j, seg in neighbours if zones[j].kind != z.kind), None)
+            if best and best[0] > 0.9:
+                draw_door_on_segment(ax, best[1])
 
     # Windows along exterior for select room types
     win_ok = {
@@ -733,20 +1120,18 @@ def enhanced_render(engine: MultiBuildingEngine, zones, build, corridors, parkin
         "SCHOOL": {"Classroom","Science Lab","Computer Lab","Library","Admin Office","Arts Room"}
     }
     building_windows = win_ok.get(bt, set())
-    for z in zones:
+    edges = engine.edges
+    if edges is None or edges.build is not build or edges.zones is not zones:
+        edges = ExteriorEdgeIndex(build, zones)
+    for i, z in enumerate(zones):
         if base_type(z.name) not in building_windows:
             continue
-        inter = z.poly.boundary.intersection(build.exterior)
-        if inter.is_empty:
-            continue
-        segs = [inter] if isinstance(inter, LineString) else list(inter.geoms) if isinstance(inter, MultiLineString) else []
-        segs = sorted(segs, key=lambda s: s.length, reverse=True)[:2]
-        for s in segs:
-            if s.length > 1.2:
+        for f in edges.for_zone(i, courtyard=False)[:2]:
+            if f.length > 1.2:
                 base = 1.6
                 if "Bedroom" in z.name or "Bath" in z.name:
                     base = 1.2
-                draw_window_on_segment(ax, s, size=min(base, s.length*0.5), lw=5, z=35)
+                draw_window_on_segment(ax, f.line, size=min(base, f.length*0.5), lw=5, z=35)
 
     ax.set_title(title, fontsize=11, pad=6)
     filename = f"{engine.building_type.lower()}_floorplan_{title.replace('•','_').replace(' ','_')}.png"
@@ -764,35 +1149,355 @@ def enhanced_render(engine: MultiBuildingEngine, zones, build, corridors, parkin
     # Console area breakdown
     print(f"\n📊 {engine.building_info['name'].upper()} AREA BREAKDOWN:")
     print("-" * 40)
-    total_room_area = sum(z.area for z in zones if z.poly and not z.poly.is_empty)
+    total_room_area = sum(z.area for z in zones if z.poly and not z.poly.is_empty and z.kind != "circulation")
     for zone in zones:
-        if zone.area > 0:
+        if zone.area > 0 and zone.kind != "circulation":
             print(f"{zone.name:25} {zone.area:6.1f}m² ({zone.area/total_room_area*100:5.1f}%)")
     print("-" * 40)
     print(f"{'TOTAL':25} {total_room_area:6.1f}m² (100.0%)")
 
+# ---------- Layout catalogue ----------
+CATALOGUE_PATH = Path(__file__).with_name("layout_catalogue")
+CATALOGUE_SHAPES = ["rectangle", "square", "Lshape", "triangle", "irregular", "courtyard"]
+CATALOGUE_AREAS = [round(150 * 1.5**k) for k in range(12)]   # 150 … ~13,000 m²
+CATALOGUE_BUDGETS = {"low": 150_000, "medium": 450_000, "high": 1_500_000}
+CATALOGUE_ASPECT = 1.7       # same plot proportion the CLI assumes
+CATALOGUE_MAX_SCALE = 1.3    # beyond this area ratio a warm start distorts rooms too much
+CATALOGUE_MAX_ASPECT = 1.5   # same, for the ratio between plot proportions
+
+def score_layout(zones, build):
+    # Usable share of the footprint, minus the share of rooms outside their size limits
+    built = build.area or 1.0
+    usable = sum(z.area for z in zones if z.kind != "circulation")
+    checked = off = 0
+    for z in zones:
+        limits = ROOM_SIZE_LIMITS.get(room_label(z.name))
+        if limits:
+            checked += 1
+            off += not (0.75*limits[0] <= z.area <= 1.5*limits[1])
+    return usable/built - 0.5*off/max(1, checked)
+
+class LayoutCatalogue:
+    # One JSON file per (type, shape, tier, program) cell; a lookup reads only its own cell
+    # and parses geometry only for the layouts it hands back
+    def __init__(self, path=CATALOGUE_PATH):
+        self.path = Path(path)
+        self.cells = {}
+
+    def __len__(self):
+        return sum(len(rows) for rows in self.cells.values())
+
+    def _cell_path(self, key):
+        building_type, land_shape, tier, (baths, with_study) = key
+        return self.path / f"{building_type}_{land_shape}_{tier}_{baths}_{int(with_study)}.json"
+
+    def _cell(self, key):
+        rows = self.cells.get(key)
+        if rows is None:
+            path = self._cell_path(key)
+            rows = self.cells[key] = json.loads(path.read_text()) if path.exists() else []
+        return rows
+
+    def add(self, entry):
+        key = (entry["type"], entry["shape"], entry["tier"], tuple(entry["program"]))
+        row = dict(entry, program=list(entry["program"]), build=entry["build"].wkt,
+                   zones=[[n, kd, w, p.wkt] for n, kd, w, p in entry["zones"]],
+                   corridors=[c.wkt for c in entry["corridors"]])
+        self.cells.setdefault(key, []).append(row)
+
+    def nearest(self, building_type, land_shape, W, H, budget, program=(2, True), k=6):
+        cell = self._cell((building_type, land_shape, classify_budget(budget), tuple(program)))
+        area, aspect = W*H, max(W, H) / max(1e-6, min(W, H))
+        def dist(e):
+            return abs(math.log(e["W"]*e["H"] / area)) + abs(math.log(max(e["W"], e["H"]) / min(e["W"], e["H"]) / aspect))
+        hits = [e for e in cell if abs(math.log(e["W"]*e["H"] / area)) <= math.log(CATALOGUE_MAX_SCALE)
+                and abs(math.log(max(e["W"], e["H"]) / min(e["W"], e["H"]) / aspect)) <= math.log(CATALOGUE_MAX_ASPECT)]
+        return [dict(e, program=tuple(e["program"]), build=wkt.loads(e["build"]),
+                     zones=[(n, kd, w, wkt.loads(p)) for n, kd, w, p in e["zones"]],
+                     corridors=[wkt.loads(c) for c in e["corridors"]])
+                for e in sorted(hits, key=lambda e: (dist(e), -e["score"]))[:k]]
+
+    def save(self):
+        self.path.mkdir(parents=True, exist_ok=True)
+        for key, rows in self.cells.items():
+            if rows:
+                self._cell_path(key).write_text(json.dumps(rows))
+
+    @classmethod
+    def load(cls, path=CATALOGUE_PATH):
+        # Cells are read on first lookup, so opening the catalogue costs nothing
+        return cls(path)
+
+def build_catalogue(path=CATALOGUE_PATH, types=None, shapes=None, areas=None, seeds=8, keep=6):
+    # Offline: generate every grid cell over several seeds and keep the best-scoring layouts
+    catalogue = LayoutCatalogue(path)
+    for bt in types or list(BUILDING_TYPES):
+        for shape in shapes or CATALOGUE_SHAPES:
+            for area in areas or CATALOGUE_AREAS:
+                H = math.sqrt(area / CATALOGUE_ASPECT)
+                W = CATALOGUE_ASPECT * H
+                for tier, budget in CATALOGUE_BUDGETS.items():
+                    scored = []
+                    for seed in range(1, seeds+1):
+                        eng = MultiBuildingEngine(bt, shape, W, H, budget, seed)
+                        build, zones, corridors, _ = eng.layout()
+                        scored.append((score_layout(zones, build), seed, build, zones, corridors))
+                    scored.sort(key=lambda r: r[0], reverse=True)
+                    for score, seed, build, zones, corridors in scored[:keep]:
+                        catalogue.add({
+                            "type": bt, "shape": shape, "tier": tier, "program": (2, True),
+                            "W": W, "H": H, "budget": budget, "seed": seed, "score": score,
+                            "build": build, "zones": [(z.name, z.kind, z.weight, z.poly) for z in zones],
+                            "corridors": corridors,
+                        })
+    catalogue.save()
+    return catalogue
+
+# ---------- Plan store ----------
+# One raw little-endian file per column, appended in place and read back with np.memmap,
+# so filters and aggregates over millions of plans never touch the PNGs.
+PLAN_STORE_PATH = Path("floorplans_output") / "plans"
+PLAN_KINDS = ["public", "service", "private", "circulation"]
+PLAN_TIERS = ["low", "medium", "high"]
+PLAN_COLUMNS = {
+    # per plan; zone_end/coord_end are the commit watermarks of the per-zone columns
+    "plan_type": "u1", "plan_shape": "u1", "plan_tier": "u1", "plan_seed": "<i8",
+    "land_w": "<f4", "land_h": "<f4", "budget": "<f8",
+    "building_area": "<f4", "usable_area": "<f4", "efficiency": "<f4",
+    "zone_start": "<i8", "zone_end": "<i8", "coord_end": "<i8",
+    # per zone
+    "zone_plan": "<i8", "zone_type": "<u2", "zone_kind": "u1", "zone_area": "<f4", "coord_start": "<i8",
+    # flat x,y pairs; parts of a multipolygon are separated by a NaN pair
+    "coords": "<f4",
+}
+PLAN_ZONE_COLUMNS = ["zone_plan", "zone_type", "zone_kind", "zone_area", "coord_start"]
+
+class PlanStore:
+    # Writers (possibly several processes) serialise on an exclusive flock. A plan is
+    # committed once its plan_type byte is on disk; anything a crashed writer left past
+    # the last committed plan is truncated away on open and before the next append.
+    def __init__(self, path=PLAN_STORE_PATH):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._maps, self._codes = {}, {}
+        with self._locked():
+            self.meta = self._read_meta()
+            self._repair()
+        self._n = len(self)
+
+    @contextmanager
+    def _locked(self):
+        import fcntl
+        with open(self.path / "lock", "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _read_meta(self):
+        meta = self.path / "meta.json"
+        return json.loads(meta.read_text()) if meta.exists() else {
+            "types": list(BUILDING_TYPES), "shapes": list(CATALOGUE_SHAPES), "room_types": []}
+
+    def _write_meta(self):
+        tmp = self.path / "meta.json.tmp"
+        tmp.write_text(json.dumps(self.meta))
+        os.replace(tmp, self.path / "meta.json")
+
+    def _lookup(self, vocab, value):
+        if vocab not in self._codes:
+            self._codes[vocab] = {v: i for i, v in enumerate(self.meta[vocab])}
+        return self._codes[vocab].get(value)
+
+    def _code(self, vocab, value):
+        code = self._lookup(vocab, value)
+        if code is None:
+            code = self._codes[vocab][value] = len(self.meta[vocab])
+            self.meta[vocab].append(value)
+        return code
+
+    def _size(self, name):
+        f = self.path / f"{name}.bin"
+        return f.stat().st_size // np.dtype(PLAN_COLUMNS[name]).itemsize if f.exists() else 0
+
+    def _committed(self, name, n):
+        # Rows of a column that belong to the first n committed plans
+        if name == "coords" or name in PLAN_ZONE_COLUMNS:
+            if not n:
+                return 0
+            end = self._read_last("coord_end" if name == "coords" else "zone_end", n)
+            return end * 2 if name == "coords" else end
+        return n
+
+    def _read_last(self, name, n):
+        itemsize = np.dtype(PLAN_COLUMNS[name]).itemsize
+        with open(self.path / f"{name}.bin", "rb") as f:
+            f.seek((n - 1) * itemsize)
+            return int(np.frombuffer(f.read(itemsize), dtype=PLAN_COLUMNS[name])[0])
+
+    def _repair(self):
+        n = len(self)
+        for name, dtype in PLAN_COLUMNS.items():
+            keep = self._committed(name, n)
+            if self._size(name) > keep:
+                os.truncate(self.path / f"{name}.bin", keep * np.dtype(dtype).itemsize)
+
+    def __len__(self):
+        return self._size("plan_type")
+
+    def append(self, engine, zones, seed=None):
+        usable = sum(z.area for z in zones if z.poly and not z.poly.is_empty and z.kind != "circulation")
+        built = engine.total_building_area
+        minx, miny, maxx, maxy = engine.land.bounds
+
+        with self._locked():
+            # Another process may have appended or added vocabulary since we last looked
+            self.meta, self._codes = self._read_meta(), {}
+            self._repair()
+            plan = len(self)
+            zone0, coord0 = self._size("zone_plan"), self._size("coords") // 2
+
+            coord_start, coords = [], []
+            for z in zones:
+                coord_start.append(coord0 + len(coords) // 2)
+                for i, g in enumerate(getattr(z.poly, "geoms", [z.poly])):
+                    if i:
+                        coords += [math.nan, math.nan]
+                    for x, y in g.exterior.coords:
+                        coords += [x, y]
+
+            zone_rows = {
+                "zone_plan": [plan] * len(zones),
+                # interned base type, so "Block C Patient Ward 2" counts as "Patient Room"
+                "zone_type": [self._code("room_types", ROOM_TYPES[z.type_id]) for z in zones],
+                "zone_kind": [PLAN_KINDS.index(z.kind) for z in zones],
+                "zone_area": [z.area for z in zones],
+                "coord_start": coord_start,
+                "coords": coords,
+            }
+            plan_rows = {
+                "plan_shape": [self._code("shapes", engine.land_shape)],
+                "plan_tier": [PLAN_TIERS.index(engine.tier)],
+                "plan_seed": [-1 if seed is None else seed],
+                "land_w": [maxx - minx], "land_h": [maxy - miny], "budget": [engine.budget],
+                "building_area": [built], "usable_area": [usable],
+                "efficiency": [usable / built * 100 if built > 0 else 0],
+                "zone_start": [zone0], "zone_end": [zone0 + len(zones)],
+                "coord_end": [coord0 + len(coords) // 2],
+                # last: the plan only counts (len) once everything above is on disk
+                "plan_type": [self._code("types", engine.building_type)],
+            }
+            for name, values in zone_rows.items():
+                self._write_column(name, values)
+            self._write_meta()
+            for name, values in plan_rows.items():
+                self._write_column(name, values)
+        self._maps.clear()
+        return plan
+
+    def _write_column(self, name, values):
+        with open(self.path / f"{name}.bin", "ab") as f:
+            f.write(np.asarray(values, dtype=PLAN_COLUMNS[name]).tobytes())
+
+    def snapshot(self):
+        # Pin the committed plan count for one query. If other writers have moved it on,
+        # drop the old maps and pick up any vocabulary they added.
+        n = len(self)
+        if n != self._n:
+            self._maps.clear()
+            self.meta, self._codes = self._read_meta(), {}
+            self._n = n
+        return n
+
+    def column(self, name, n=None):
+        # Rows of a column belonging to the first n plans (default: all committed now)
+        n = self.snapshot() if n is None else n
+        if (name, n) not in self._maps:
+            rows = self._committed(name, n)
+            dtype = PLAN_COLUMNS[name]
+            self._maps[name, n] = np.memmap(self.path / f"{name}.bin", dtype=dtype, mode="r", shape=(rows,)) if rows else np.zeros(0, dtype)
+        return self._maps[name, n]
+
+    def select(self, building_type=None, tier=None, min_efficiency=None):
+        # Plan indices matching every given filter
+        n = self.snapshot()
+        mask = np.ones(n, dtype=bool)
+        if building_type is not None:
+            code = self._lookup("types", building_type)
+            if code is None:
+                return np.zeros(0, dtype=np.int64)
+            mask &= self.column("plan_type", n) == code
+        if tier is not None:
+            mask &= self.column("plan_tier", n) == PLAN_TIERS.index(tier)
+        if min_efficiency is not None:
+            mask &= self.column("efficiency", n) > min_efficiency
+        return np.flatnonzero(mask)
+
+    def mean_zone_area(self, room_type, by="plan_tier", plans=None):
+        # Average area of one room type (base_type names), grouped by a per-plan column
+        n = self.snapshot()
+        code = self._lookup("room_types", room_type)
+        if code is None:
+            return {}
+        zone_plan = self.column("zone_plan", n)
+        mask = self.column("zone_type", n) == code
+        if plans is not None:
+            mask &= np.isin(zone_plan, plans)
+        groups = np.asarray(self.column(by, n))[zone_plan[mask]]
+        areas = np.asarray(self.column("zone_area", n)[mask], dtype=np.float64)
+        keys = PLAN_TIERS if by == "plan_tier" else None
+        result = {}
+        for g in np.unique(groups):
+            key = keys[g] if keys else g.item()
+            result[key] = float(areas[groups == g].mean())
+        return result
+
+    def zone_rings(self, zone):
+        # Exterior rings of one stored zone as (n, 2) arrays
+        n = self.snapshot()
+        coord_start, coords = self.column("coord_start", n), self.column("coords", n)
+        start = coord_start[zone] * 2
+        end = coord_start[zone+1] * 2 if zone + 1 < len(coord_start) else len(coords)
+        xy = np.asarray(coords[start:end]).reshape(-1, 2)
+        breaks = np.flatnonzero(np.isnan(xy[:, 0]))
+        rings = [part[~np.isnan(part[:, 0])] for part in np.split(xy, breaks)]
+        return [r for r in rings if len(r)]
+
 # ---------- Public API ----------
 def generate_building(building_type="HOUSE", land_shape="rectangle", land_w=None, land_h=None,
-                      bedrooms=3, baths=2, with_study=True, budget=None, seed=None):
+                      bedrooms=3, baths=2, with_study=True, budget=None, seed=None, workers=None, catalogue=None,
+                      store=None):
     building_info = BUILDING_TYPES[building_type]
     if land_w is None or land_h is None:
         land_w, land_h = building_info["default_land"]
     if budget is None:
         budget = building_info["default_budget"]
 
+    # Common plots reuse precomputed layouts; only outliers are generated from scratch
+    program = (max(2, baths), with_study) if building_type == "HOUSE" else (2, True)
+    hits = catalogue.nearest(building_type, land_shape, land_w, land_h, budget, program) if catalogue else []
+
     print(f"\n🎨 Generating 6 designs for {building_info['name']}...")
     for i in range(6):
         use_seed = random.randint(1, 99999) if seed is None else seed + i
-        print(f"\n🧱 Design {i+1}/6 — Seed: {use_seed}")
-        eng = MultiBuildingEngine(building_type, land_shape, land_w, land_h, budget, use_seed)
-        build, zones, corridors, parking = eng.layout(bedrooms, baths, with_study)
+        eng = MultiBuildingEngine(building_type, land_shape, land_w, land_h, budget, use_seed, workers)
+        if i < len(hits):
+            print(f"\n🧱 Design {i+1}/6 — Catalogue seed: {hits[i]['seed']}")
+            build, zones, corridors, parking = eng.warm_start(hits[i])
+        else:
+            print(f"\n🧱 Design {i+1}/6 — Seed: {use_seed}")
+            build, zones, corridors, parking = eng.layout(bedrooms, baths, with_study)
         title = f"{building_info['name']} • {land_shape} {land_w}×{land_h} • ${budget:,} • Design {i+1}"
         enhanced_render(eng, zones, build, corridors, parking, title=title)
+        if store is not None:
+            store.append(eng, zones, seed=hits[i]["seed"] if i < len(hits) else use_seed)
 
 if __name__ == "__main__":
-    import sys
-    from pathlib import Path
-    import math
+    if len(sys.argv) >= 2 and sys.argv[1] == "--build-catalogue":
+        catalogue = build_catalogue()
+        print(f"📚 Catalogue with {len(catalogue)} layouts saved in: {CATALOGUE_PATH}")
+        sys.exit(0)
 
     Path("floorplans_output").mkdir(exist_ok=True)
     print("=== FINAL MULTI-DESIGN FLOORPLAN GENERATOR (Bathrooms fixed + Folder Save) ===")
@@ -814,5 +1519,6 @@ if __name__ == "__main__":
     land_w = ratio * land_h
 
     print(f"📥 Input Received -> Type: {building_type}, Shape: {land_shape}, Size: {land_w:.1f}×{land_h:.1f}m ≈ {land_size}m², Budget: {budget}")
-    generate_building(building_type, land_shape, land_w, land_h, 3, 2, True, budget)
+    generate_building(building_type, land_shape, land_w, land_h, 3, 2, True, budget,
+                      catalogue=LayoutCatalogue.load(), store=PlanStore())
     print("\n🎉 Finished generating 6 designs.")